@@ -5,21 +5,38 @@ Place in: Designer -> Scripting -> Project Library -> New Script
 Name it:  aem_auth
 
 Handles OAuth 2.0 Client Credentials token management using:
-  - system.net.httpPost() for Adobe IMS token requests
-  - system.db.*()         for token caching in MS SQL Server
+  - system.util.getGlobals() for an in-memory token cache shared by all ticks
+  - system.db.*()            for token caching in MS SQL Server
+  - system.net.httpPost()    for Adobe IMS token requests
+
+The in-memory cache is checked first, so a timer tick with a valid token makes
+no DB calls at all. The DB cache is only read when memory is empty (e.g. after
+a gateway restart), and the table check runs once per gateway lifetime.
 
 Note: This is Jython 2.7 — no f-strings, no type hints, no asyncio.
 """
 import json
 
 EXPIRY_BUFFER_SECONDS = 60  # Refresh token this many seconds before actual expiry
+GLOBALS_KEY = "aem_auth"    # Key of this script's state in system.util.getGlobals()
+
+
+def _memory_cache():
+    """Gateway-wide dict that survives between timer ticks (cleared on gateway restart)."""
+    state = system.util.getGlobals().setdefault(GLOBALS_KEY, {})
+    state.setdefault("tokens", {})   # client_id -> (access_token, expires_at_millis)
+    state.setdefault("tables", {})   # "db_connection/table" -> True once ensured
+    return state
+
+
+def _is_expired_millis(expires_at_ms):
+    now_ms = system.date.toMillis(system.date.now())
+    return now_ms >= (expires_at_ms - EXPIRY_BUFFER_SECONDS * 1000)
 
 
 def _is_expired(expires_at):
     """Check whether a cached token (java.util.Date) is expired."""
-    now = system.date.now()
-    buffer_ms = EXPIRY_BUFFER_SECONDS * 1000
-    return system.date.toMillis(now) >= (system.date.toMillis(expires_at) - buffer_ms)
+    return _is_expired_millis(system.date.toMillis(expires_at))
 
 
 def _ensure_table(db_connection, table_name):
@@ -90,19 +107,31 @@ def _request_new_token(token_url, client_id, client_secret, scope):
 def get_valid_token(config):
     """
     Return a valid Bearer access token.
-    Checks the DB cache first; requests a new one from IMS if missing or expired.
+    Checks the in-memory cache, then the DB cache; requests a new one from IMS
+    if missing or expired.
 
     config: dict with keys:
         token_url, client_id, client_secret, scope,
         db_connection, db_table
     """
     logger = system.util.getLogger("aem_auth")
+    cache = _memory_cache()
+
+    cached = cache["tokens"].get(config["client_id"])
+    if cached and not _is_expired_millis(cached[1]):
+        logger.debug("Token cache: valid token in memory — reusing.")
+        return cached[0]
+
+    table_key = config["db_connection"] + "/" + config["db_table"]
+    if not cache["tables"].get(table_key):
+        _ensure_table(config["db_connection"], config["db_table"])
+        cache["tables"][table_key] = True
 
-    _ensure_table(config["db_connection"], config["db_table"])
     access_token, expires_at = _load_token(config["db_connection"], config["db_table"])
 
     if access_token and expires_at and not _is_expired(expires_at):
-        logger.info("Token cache: valid token found — reusing.")
+        logger.info("Token cache: valid token found in DB — reusing.")
+        cache["tokens"][config["client_id"]] = (access_token, system.date.toMillis(expires_at))
         return access_token
 
     if access_token:
@@ -119,5 +148,6 @@ def get_valid_token(config):
 
     expires_at = system.date.addSeconds(system.date.now(), expires_in)
     _save_token(config["db_connection"], config["db_table"], access_token, expires_at)
+    cache["tokens"][config["client_id"]] = (access_token, system.date.toMillis(expires_at))
     logger.info("Token acquired and cached.")
     return access_token
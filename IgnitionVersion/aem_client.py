@@ -9,15 +9,26 @@ Handles AEM HTTP operations:
   - PDF upload        via Java HttpURLConnection (multipart/form-data)
 
 The multipart upload uses Java classes directly because Ignition's
-system.net.httpPost() does not support multipart/form-data.
+system.net.httpPost() does not support multipart/form-data. The body length
+is computed up front so the connection can use fixed-length streaming (no
+in-memory copy of the PDF), and the file is copied through a large buffer.
 
 Note: This is Jython 2.7 — no f-strings, no type hints, no asyncio.
 """
 import json
 
-from java.io import DataOutputStream, File, FileInputStream
+import jarray
+from java.io import BufferedOutputStream, File, FileInputStream
+from java.lang import String
 from java.net import URL
 
+BUFFER_SIZE = 256 * 1024  # bytes per read/write when streaming the PDF
+
+
+def _utf8(text):
+    """Encode text as a Java byte[] (UTF-8) for writing to an OutputStream."""
+    return String(text).getBytes("UTF-8")
+
 
 def fetch_csrf_token(upload_base_url, access_token):
     """Fetch a CSRF token from the AEM Granite endpoint."""
@@ -52,7 +63,8 @@ def upload_pdf(config, file_path, title, access_token):
     """
     logger = system.util.getLogger("aem_client")
 
-    if not File(file_path).exists():
+    pdf_file = File(file_path)
+    if not pdf_file.exists():
         raise Exception("File not found: " + file_path)
 
     csrf_token = fetch_csrf_token(config["upload_base_url"], access_token)
@@ -62,7 +74,19 @@ def upload_pdf(config, file_path, title, access_token):
     upload_url = config["upload_base_url"] + config["assets_dam_path"] + "/" + filename
     boundary = "----AEMBoundary" + str(system.date.toMillis(system.date.now()))
 
-    logger.info("Uploading {} -> {}".format(filename, upload_url))
+    # -- title metadata field, then the header of the PDF binary field --
+    head = _utf8(
+        "--" + boundary + "\r\n"
+        + "Content-Disposition: form-data; name=\"title\"\r\n\r\n"
+        + title + "\r\n"
+        + "--" + boundary + "\r\n"
+        + "Content-Disposition: form-data; name=\"file\"; filename=\"{}\"\r\n".format(filename)
+        + "Content-Type: application/pdf\r\n\r\n"
+    )
+    tail = _utf8("\r\n--" + boundary + "--\r\n")
+    content_length = len(head) + pdf_file.length() + len(tail)
+
+    logger.info("Uploading {} ({} bytes) -> {}".format(filename, content_length, upload_url))
 
     # Open Java HTTP connection
     url_obj = URL(upload_url)
@@ -74,35 +98,28 @@ def upload_pdf(config, file_path, title, access_token):
     conn.setRequestProperty("Content-Type", "multipart/form-data; boundary=" + boundary)
     conn.setConnectTimeout(10000)
     conn.setReadTimeout(120000)
+    # Stream straight to the socket instead of buffering the whole body in memory
+    conn.setFixedLengthStreamingMode(content_length)
 
-    out = DataOutputStream(conn.getOutputStream())
-
-    # -- title metadata field --
-    out.writeBytes("--" + boundary + "\r\n")
-    out.writeBytes("Content-Disposition: form-data; name=\"title\"\r\n\r\n")
-    out.writeBytes(title + "\r\n")
-
-    # -- PDF binary field --
-    out.writeBytes("--" + boundary + "\r\n")
-    out.writeBytes(
-        "Content-Disposition: form-data; name=\"file\"; filename=\"{}\"\r\n".format(filename)
-    )
-    out.writeBytes("Content-Type: application/pdf\r\n\r\n")
-
-    fis = FileInputStream(File(file_path))
-    buf = [0] * 8192
-    n = fis.read(buf)
-    while n != -1:
-        out.write(buf, 0, n)
-        n = fis.read(buf)
-    fis.close()
-
-    out.writeBytes("\r\n--" + boundary + "--\r\n")
-    out.flush()
-    out.close()
-
-    status = conn.getResponseCode()
-    conn.disconnect()
+    fis = FileInputStream(pdf_file)
+    try:
+        out = BufferedOutputStream(conn.getOutputStream(), BUFFER_SIZE)
+        try:
+            out.write(head)
+            buf = jarray.zeros(BUFFER_SIZE, "b")
+            n = fis.read(buf)
+            while n != -1:
+                out.write(buf, 0, n)
+                n = fis.read(buf)
+            out.write(tail)
+            out.flush()
+        finally:
+            out.close()
+
+        status = conn.getResponseCode()
+    finally:
+        fis.close()
+        conn.disconnect()
 
     if status == 201:
         asset_path = config["assets_dam_path"] + "/" + filename
@@ -0,0 +1,112 @@
+"""
+Ignition Project Library Script: aem_queue
+
+Place in: Designer -> Scripting -> Project Library -> New Script
+Name it:  aem_queue
+
+Owns the upload queue Dataset tag ([default]AEM/Upload/Queue, columns
+FilePath, Title, Attempts) and the failed-uploads Dataset tag
+([default]AEM/Upload/Failed). Tag reads and writes are not atomic, so every
+change to the queue is a read-modify-write done while holding a gateway-wide
+lock kept in system.util.getGlobals(). Rows appended with enqueue_upload() can
+therefore never be lost when the timer script updates the queue after a tick.
+
+A row whose upload fails is moved to the end of the queue with its Attempts
+count raised, so a slow or permanently failing file cannot starve the rows
+behind it. After max_attempts failures it is parked in the Failed tag, with
+the last error, and no longer retried.
+
+Writers that bypass this script (a direct system.tag.writeBlocking, or a
+Vision client, whose globals are not the gateway's) do not take the lock and
+can still lose a row if they write during the timer's removal.
+
+Note: This is Jython 2.7 — no f-strings, no type hints, no asyncio.
+"""
+import threading
+
+QUEUE_TAG = "[default]AEM/Upload/Queue"
+QUEUE_COLUMNS = ["FilePath", "Title", "Attempts"]
+FAILED_TAG = "[default]AEM/Upload/Failed"
+FAILED_COLUMNS = ["FilePath", "Title", "Attempts", "LastError"]
+DEFAULT_MAX_ATTEMPTS = 3
+GLOBALS_KEY = "aem_queue.lock"  # Key of the queue lock in system.util.getGlobals()
+
+
+def _lock():
+    """Gateway-wide lock guarding the queue tag (survives project saves)."""
+    return system.util.getGlobals().setdefault(GLOBALS_KEY, threading.Lock())
+
+
+def _rows(dataset):
+    """Queue rows as [FilePath, Title, Attempts] lists; Attempts is 0 if the column is missing."""
+    if dataset is None:
+        return []
+    has_attempts = "Attempts" in list(dataset.getColumnNames())
+    rows = []
+    for row in range(dataset.getRowCount()):
+        attempts = dataset.getValueAt(row, "Attempts") if has_attempts else 0
+        rows.append([dataset.getValueAt(row, "FilePath"), dataset.getValueAt(row, "Title"), int(attempts or 0)])
+    return rows
+
+
+def enqueue_upload(file_path, title):
+    """Append one file to the upload queue. Use this instead of writing the tag directly."""
+    lock = _lock()
+    lock.acquire()
+    try:
+        rows = _rows(system.tag.readBlocking([QUEUE_TAG])[0].value)
+        rows.append([file_path, title, 0])
+        system.tag.writeBlocking([QUEUE_TAG], [system.dataset.toDataSet(QUEUE_COLUMNS, rows)])
+    finally:
+        lock.release()
+
+
+def finish_tick(uploaded, failed, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """
+    Update the queue after a tick, keeping rows added since it was read.
+
+    uploaded: FilePaths uploaded this tick — one matching row is removed per path.
+    failed:   (FilePath, error) pairs — one matching row per pair is moved to the end
+              of the queue with Attempts + 1, or to the Failed tag once Attempts
+              reaches max_attempts.
+    """
+    uploaded = list(uploaded)
+    failed = list(failed)
+    lock = _lock()
+    lock.acquire()
+    try:
+        current, failed_before = [qv.value for qv in system.tag.readBlocking([QUEUE_TAG, FAILED_TAG])]
+        kept, retry, parked = [], [], []
+        for file_path, title, tries in _rows(current):
+            if file_path in uploaded:
+                uploaded.remove(file_path)
+                continue
+            error = None
+            for i, (failed_path, failed_error) in enumerate(failed):
+                if failed_path == file_path:
+                    error = failed_error
+                    del failed[i]
+                    break
+            if error is None:
+                kept.append([file_path, title, tries])
+            elif tries + 1 >= max_attempts:
+                parked.append([file_path, title, tries + 1, error])
+            else:
+                retry.append([file_path, title, tries + 1])
+
+        paths = [QUEUE_TAG]
+        values = [system.dataset.toDataSet(QUEUE_COLUMNS, kept + retry)]
+        if parked:
+            logger = system.util.getLogger("aem_queue")
+            for file_path, title, tries, error in parked:
+                logger.error("Giving up on {} after {} attempt(s) — moved to {}: {}".format(
+                    file_path, tries, FAILED_TAG, error))
+            previous = []
+            if failed_before is not None:
+                previous = [[failed_before.getValueAt(row, col) for col in FAILED_COLUMNS]
+                            for row in range(failed_before.getRowCount())]
+            paths.append(FAILED_TAG)
+            values.append(system.dataset.toDataSet(FAILED_COLUMNS, previous + parked))
+        system.tag.writeBlocking(paths, values)
+    finally:
+        lock.release()
@@ -4,51 +4,108 @@ Ignition Gateway Timer Event Script
 Place in: Designer -> Gateway Event Scripts -> Timer -> Add Timer
 Set interval to match your upload frequency (e.g. every 60 seconds).
 
-Requires Project Library scripts: aem_auth, aem_client
+Requires Project Library scripts: aem_auth, aem_client, aem_queue
 Requires Ignition Tags at paths defined in the config block below.
 Requires a named DB connection called 'ignition_db' in the Gateway.
 
 How it works:
-  1. Reads the file path and title from Tags on each timer tick.
-  2. If no file is queued (FilePath tag is empty), it does nothing.
-  3. If a file is queued, it authenticates, uploads, and clears the tag.
+  1. Reads every config tag and the upload queue in ONE system.tag.readBlocking call.
+  2. The queue is a Dataset tag (columns FilePath, Title, Attempts). If it is empty,
+     it does nothing.
+  3. Otherwise it uploads queued files one after another until the queue is drained
+     or the tick's time budget (TickBudgetSeconds) is used up, then updates the queue
+     via aem_queue (under the queue lock): uploaded rows are removed, failed rows
+     move to the end of the queue so they cannot starve the rows behind them, and
+     a row that has failed MaxAttempts times is parked in the Failed tag.
+  4. The legacy single-file tags (Upload/FilePath, Upload/Title) are still honoured.
 """
 logger = system.util.getLogger("AEMUpload")
 
-# ── Configuration (read from Ignition Tags) ───────────────────────────────────
+QUEUE_TAG = aem_queue.QUEUE_TAG
+FILE_PATH_TAG = "[default]AEM/Upload/FilePath"
+TITLE_TAG = "[default]AEM/Upload/Title"
+DEFAULT_TICK_BUDGET_SECONDS = 45  # keep below the timer interval
+
+# ── Configuration and queue (read from Ignition Tags in one call) ─────────────
 # Adjust tag paths to match your project structure.
+tag_keys = [
+    ("token_url",       "[default]AEM/Config/TokenURL"),
+    ("client_id",       "[default]AEM/Config/ClientID"),
+    ("client_secret",   "[default]AEM/Config/ClientSecret"),
+    ("scope",           "[default]AEM/Config/Scope"),
+    ("upload_base_url", "[default]AEM/Config/UploadBaseURL"),
+    ("assets_dam_path", "[default]AEM/Config/AssetsDamPath"),
+    ("tick_budget",     "[default]AEM/Config/TickBudgetSeconds"),  # optional
+    ("max_attempts",    "[default]AEM/Config/MaxAttempts"),        # optional
+    ("queue",           QUEUE_TAG),
+    ("file_path",       FILE_PATH_TAG),
+    ("title",           TITLE_TAG),
+]
+tag_values = system.tag.readBlocking([path for key, path in tag_keys])
+tags = dict((key, qv.value) for (key, path), qv in zip(tag_keys, tag_values))
+
 config = {
-    "token_url":       system.tag.readBlocking(["[default]AEM/Config/TokenURL"])[0].value,
-    "client_id":       system.tag.readBlocking(["[default]AEM/Config/ClientID"])[0].value,
-    "client_secret":   system.tag.readBlocking(["[default]AEM/Config/ClientSecret"])[0].value,
-    "scope":           system.tag.readBlocking(["[default]AEM/Config/Scope"])[0].value,
-    "upload_base_url": system.tag.readBlocking(["[default]AEM/Config/UploadBaseURL"])[0].value,
-    "assets_dam_path": system.tag.readBlocking(["[default]AEM/Config/AssetsDamPath"])[0].value,
+    "token_url":       tags["token_url"],
+    "client_id":       tags["client_id"],
+    "client_secret":   tags["client_secret"],
+    "scope":           tags["scope"],
+    "upload_base_url": tags["upload_base_url"],
+    "assets_dam_path": tags["assets_dam_path"],
     "db_connection":   "ignition_db",     # Named DB connection in Ignition Gateway
     "db_table":        "aem_token_cache",
 }
+budget_ms = int(tags["tick_budget"] or DEFAULT_TICK_BUDGET_SECONDS) * 1000
+max_attempts = int(tags["max_attempts"] or aem_queue.DEFAULT_MAX_ATTEMPTS)
 
-# ── Check for a queued upload ─────────────────────────────────────────────────
-file_path = system.tag.readBlocking(["[default]AEM/Upload/FilePath"])[0].value
-title     = system.tag.readBlocking(["[default]AEM/Upload/Title"])[0].value
+# ── Collect queued uploads ────────────────────────────────────────────────────
+jobs = []  # (source, file_path, title)
+queue = tags["queue"]
+if queue is not None:
+    for row in range(queue.getRowCount()):
+        jobs.append(("queue", queue.getValueAt(row, "FilePath"), queue.getValueAt(row, "Title")))
+if tags["file_path"]:
+    jobs.append(("legacy", tags["file_path"], tags["title"]))
 
-if not file_path:
+if not jobs:
     logger.info("No file queued for upload — skipping.")
 else:
-    try:
-        logger.info("Upload triggered: {} ({})".format(file_path, title))
+    start_ms = system.date.toMillis(system.date.now())
+    token = None
+    attempted = 0
+    uploaded = []  # queue FilePaths uploaded this tick
+    failed = []    # (FilePath, error) for queue rows that failed this tick
+
+    for source, file_path, title in jobs:
+        elapsed_ms = system.date.toMillis(system.date.now()) - start_ms
+        if attempted and elapsed_ms >= budget_ms:
+            logger.info("Tick budget used ({} ms) — {} file(s) left for the next tick.".format(
+                elapsed_ms, len(jobs) - attempted))
+            break
+        attempted += 1
+
+        try:
+            logger.info("Upload triggered: {} ({})".format(file_path, title))
+
+            if token is None:
+                token = aem_auth.get_valid_token(config)
+            asset_path = aem_client.upload_pdf(config, file_path, title, token)
+
+            logger.info("Done. Asset available at: " + asset_path)
 
-        token      = aem_auth.get_valid_token(config)
-        asset_path = aem_client.upload_pdf(config, file_path, title, token)
+            if source == "queue":
+                uploaded.append(file_path)
+            else:
+                # Clear the upload tags so the same file is not uploaded again
+                system.tag.writeBlocking([FILE_PATH_TAG, TITLE_TAG], ["", ""])
 
-        logger.info("Done. Asset available at: " + asset_path)
+        except Exception as e:
+            logger.error("AEM upload failed for {}: {}".format(file_path, str(e)))
+            if source == "queue":
+                failed.append((file_path, str(e)))
 
-        # Clear the upload tags so the same file is not uploaded again
-        system.tag.writeBlocking(
-            ["[default]AEM/Upload/FilePath", "[default]AEM/Upload/Title"],
-            ["", ""]
-        )
+    if uploaded or failed:
+        # Locked read-modify-write, so rows added while this tick was uploading are kept.
+        aem_queue.finish_tick(uploaded, failed, max_attempts)
 
-    except Exception as e:
-        logger.error("AEM upload failed: " + str(e))
-        # Tag is NOT cleared on failure — allows manual retry or investigation
+    logger.info("Tick finished: {} of {} queued file(s) attempted in {} ms.".format(
+        attempted, len(jobs), system.date.toMillis(system.date.now()) - start_ms))
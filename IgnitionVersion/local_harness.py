@@ -0,0 +1,461 @@
+"""
+local_harness.py — Run the Ignition scripts on plain CPython (no gateway needed).
+
+Installs a fake `system` module (tags, datasets, db, net, date, util) and
+minimal stand-ins for the Java classes the scripts import (java.io, java.lang,
+java.net, jarray), loads aem_auth / aem_client / aem_queue as modules and executes
+gateway_timer_script.py once per simulated tick. Then checks that:
+  - config and queue tags are read in one batched readBlocking call
+  - a tick drains every queued file and removes them from the queue
+  - the upload uses fixed-length streaming and the body matches that length
+  - the token comes from gateway globals after the first tick (no DB, no IMS)
+  - the tick time budget stops draining and leaves the rest queued
+  - a failed upload stays queued while the other files are still uploaded
+  - a slow failing row moves behind the good rows instead of using every tick,
+    and is parked in the Failed tag after MaxAttempts failures
+  - rows enqueued during a tick survive the removal of uploaded rows, and
+    enqueue_upload() waits while the queue lock is held
+
+Usage:
+    python IgnitionVersion/local_harness.py
+
+Exits with code 1 if any check fails. No external dependencies required.
+"""
+import builtins
+import importlib.util
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+import types
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+logging.basicConfig(
+    level=logging.WARNING,
+    format="%(asctime)s  %(levelname)-7s  %(name)s  %(message)s",
+    datefmt="%H:%M:%S",
+)
+
+
+# ── Fake Java classes ─────────────────────────────────────────────────────────
+class FakeFile:
+    def __init__(self, path):
+        self.path = path
+
+    def exists(self):
+        return os.path.isfile(self.path)
+
+    def length(self):
+        return os.path.getsize(self.path)
+
+
+class FakeFileInputStream:
+    def __init__(self, file_obj):
+        self._fh = open(file_obj.path, "rb")
+
+    def read(self, buf):
+        n = self._fh.readinto(buf)
+        return n if n else -1
+
+    def close(self):
+        self._fh.close()
+
+
+class FakeBufferedOutputStream:
+    def __init__(self, out, size):
+        self._out = out
+        self.size = size
+
+    def write(self, data, off=0, length=None):
+        length = len(data) - off if length is None else length
+        self._out.write(bytes(data[off:off + length]))
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self._out.close()
+
+
+class FakeString:
+    def __init__(self, text):
+        self._text = text
+
+    def getBytes(self, encoding):
+        return self._text.encode(encoding)
+
+
+class FakeSocketStream:
+    """Records the bytes written to a FakeConnection."""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def write(self, data):
+        self._conn.body += data
+        if self._conn.fixed_length is not None and len(self._conn.body) > self._conn.fixed_length:
+            raise IOError("wrote more than the fixed streaming length")
+
+    def close(self):
+        self._conn.closed = True
+
+
+class FakeConnection:
+    def __init__(self, server, url):
+        self.server = server
+        self.url = url
+        self.headers = {}
+        self.fixed_length = None
+        self.body = b""
+        self.closed = False
+
+    def setDoOutput(self, value):
+        pass
+
+    def setRequestMethod(self, method):
+        self.method = method
+
+    def setRequestProperty(self, key, value):
+        self.headers[key] = value
+
+    def setConnectTimeout(self, ms):
+        pass
+
+    def setReadTimeout(self, ms):
+        pass
+
+    def setFixedLengthStreamingMode(self, length):
+        self.fixed_length = length
+
+    def getOutputStream(self):
+        return FakeSocketStream(self)
+
+    def getResponseCode(self):
+        self.server.uploads.append(self)
+        for name, delay_ms in self.server.slow_failures.items():
+            if self.url.endswith("/" + name):
+                self.server.clock_offset_ms += delay_ms
+                return 500
+        return self.server.upload_status
+
+    def disconnect(self):
+        pass
+
+
+class FakeURL:
+    server = None  # set by FakeSystem
+
+    def __init__(self, url):
+        self.url = url
+
+    def openConnection(self):
+        return FakeConnection(FakeURL.server, self.url)
+
+
+# ── Fake `system` ─────────────────────────────────────────────────────────────
+class QualifiedValue:
+    def __init__(self, value):
+        self.value = value
+
+
+class FakeDataset:
+    def __init__(self, headers, rows):
+        self.headers = list(headers)
+        self.rows = [list(r) for r in rows]
+
+    def getRowCount(self):
+        return len(self.rows)
+
+    def getColumnCount(self):
+        return len(self.headers)
+
+    def getColumnNames(self):
+        return list(self.headers)
+
+    def getValueAt(self, row, col):
+        if not isinstance(col, int):
+            col = self.headers.index(col)
+        return self.rows[row][col]
+
+
+class FakeDate:
+    def __init__(self, millis):
+        self.millis = millis
+
+
+class FakeSystem(types.ModuleType):
+    """The slice of Ignition's `system` API the AEM scripts use, with call counters."""
+
+    def __init__(self):
+        super().__init__("system")
+        self.tag_values = {}
+        self.tag_read_calls = []
+        self.db_calls = []
+        self.db_row = None
+        self.ims_calls = 0
+        self.csrf_calls = 0
+        self.uploads = []
+        self.upload_status = 201
+        self.globals = {}
+        self.clock_offset_ms = 0
+        self.upload_delay_ms = 0
+        self.slow_failures = {}  # file name -> simulated ms before its upload fails with HTTP 500
+        self.on_upload = None  # optional callback run during each upload
+
+        self.tag = types.SimpleNamespace(readBlocking=self._read_tags, writeBlocking=self._write_tags)
+        self.dataset = types.SimpleNamespace(toDataSet=FakeDataset)
+        self.util = types.SimpleNamespace(getLogger=logging.getLogger, getGlobals=lambda: self.globals)
+        self.date = types.SimpleNamespace(
+            now=lambda: FakeDate(int(time.time() * 1000) + self.clock_offset_ms),
+            toMillis=lambda d: d.millis,
+            addSeconds=lambda d, s: FakeDate(d.millis + int(s) * 1000),
+        )
+        self.db = types.SimpleNamespace(
+            runUpdateQuery=self._run_update, runQuery=self._run_query, runPrepUpdate=self._run_prep_update,
+        )
+        self.net = types.SimpleNamespace(httpPost=self._http_post, httpGet=self._http_get)
+        FakeURL.server = self
+
+    # tags
+    def _read_tags(self, paths):
+        self.tag_read_calls.append(list(paths))
+        return [QualifiedValue(self.tag_values.get(p)) for p in paths]
+
+    def _write_tags(self, paths, values):
+        for p, v in zip(paths, values):
+            self.tag_values[p] = v
+
+    # db
+    def _run_update(self, sql, database=None):
+        self.db_calls.append("update")
+
+    def _run_query(self, sql, database=None):
+        self.db_calls.append("query")
+        if self.db_row is None:
+            return []
+        return [{"access_token": self.db_row[0], "expires_at": self.db_row[1]}]
+
+    def _run_prep_update(self, sql, args, database=None):
+        self.db_calls.append("prep_update")
+        self.db_row = (args[0], args[1])
+
+    # net
+    def _http_post(self, url, content_type, data):
+        self.ims_calls += 1
+        return json.dumps({"access_token": "token-%d" % self.ims_calls, "expires_in": 3600})
+
+    def _http_get(self, url, **kwargs):
+        self.csrf_calls += 1
+        # Each upload "takes" upload_delay_ms of simulated time.
+        self.clock_offset_ms += self.upload_delay_ms
+        if self.on_upload:
+            self.on_upload()
+        return json.dumps({"token": "csrf"})
+
+
+def _install_fakes():
+    fake = FakeSystem()
+    builtins.system = fake
+
+    java = types.ModuleType("java")
+    java_io = types.ModuleType("java.io")
+    java_io.File, java_io.FileInputStream = FakeFile, FakeFileInputStream
+    java_io.BufferedOutputStream = FakeBufferedOutputStream
+    java_lang = types.ModuleType("java.lang")
+    java_lang.String = FakeString
+    java_net = types.ModuleType("java.net")
+    java_net.URL = FakeURL
+    jarray = types.ModuleType("jarray")
+    jarray.zeros = lambda n, typecode: bytearray(n)
+    sys.modules.update({
+        "java": java, "java.io": java_io, "java.lang": java_lang, "java.net": java_net, "jarray": jarray,
+    })
+    return fake
+
+
+def _load_library(name):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(_HERE, name + ".py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# ── Scenario helpers ──────────────────────────────────────────────────────────
+class Harness:
+    CONFIG_TAGS = {
+        "[default]AEM/Config/TokenURL": "https://ims.invalid/ims/token/v3",
+        "[default]AEM/Config/ClientID": "harness-client",
+        "[default]AEM/Config/ClientSecret": "secret",
+        "[default]AEM/Config/Scope": "openid",
+        "[default]AEM/Config/UploadBaseURL": "https://aem.invalid",
+        "[default]AEM/Config/AssetsDamPath": "/api/assets/pdf-uploads",
+    }
+    QUEUE_TAG = "[default]AEM/Upload/Queue"
+    FAILED_TAG = "[default]AEM/Upload/Failed"
+
+    def __init__(self, workdir):
+        self.workdir = workdir
+        self.system = _install_fakes()
+        self.system.tag_values.update(self.CONFIG_TAGS)
+        self.aem_auth = _load_library("aem_auth")
+        self.aem_client = _load_library("aem_client")
+        self.aem_queue = _load_library("aem_queue")
+        with open(os.path.join(_HERE, "gateway_timer_script.py"), encoding="utf-8") as fh:
+            self.timer_code = compile(fh.read(), "gateway_timer_script.py", "exec")
+
+    def make_pdf(self, name, size):
+        path = os.path.join(self.workdir, name)
+        with open(path, "wb") as fh:
+            fh.write(b"%PDF-1.4\n" + b"x" * max(0, size - 15) + b"%%EOF\n")
+        return path
+
+    def queue(self, *paths):
+        rows = [[p, os.path.splitext(os.path.basename(p))[0]] for p in paths]
+        self.system.tag_values[self.QUEUE_TAG] = FakeDataset(["FilePath", "Title"], rows)
+
+    def queued_paths(self):
+        ds = self.system.tag_values[self.QUEUE_TAG]
+        return [ds.getValueAt(r, "FilePath") for r in range(ds.getRowCount())]
+
+    def tick(self):
+        self.system.tag_read_calls.clear()
+        exec(self.timer_code, {
+            "__name__": "__gateway_timer__",
+            "system": self.system,
+            "aem_auth": self.aem_auth,
+            "aem_client": self.aem_client,
+            "aem_queue": self.aem_queue,
+        })
+
+
+_failures = []
+
+
+def check(description, condition):
+    print(("PASS  " if condition else "FAIL  ") + description)
+    if not condition:
+        _failures.append(description)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as workdir:
+        h = Harness(workdir)
+        s = h.system
+
+        # Tick 1: drain five queued files in one tick
+        files = [h.make_pdf("report_%d.pdf" % i, 2000 + i) for i in range(4)]
+        files.append(h.make_pdf("drawings.pdf", 600 * 1024))  # larger than one 256 KB buffer
+        h.queue(*files)
+        h.tick()
+
+        first_read = s.tag_read_calls[0]
+        check("config and queue tags read in one readBlocking call",
+              h.QUEUE_TAG in first_read and all(p in first_read for p in h.CONFIG_TAGS))
+        check("one tick uploads all 5 queued files", len(s.uploads) == 5)
+        check("uploaded rows are removed from the queue", h.queued_paths() == [])
+        check("every upload uses fixed-length streaming",
+              all(c.fixed_length is not None for c in s.uploads))
+        check("body length equals the declared fixed length",
+              all(len(c.body) == c.fixed_length for c in s.uploads))
+        with open(files[-1], "rb") as fh:
+            check("large PDF is streamed intact through the buffer", fh.read() in s.uploads[-1].body)
+        check("first tick requests one IMS token", s.ims_calls == 1)
+
+        # Tick 2: token comes from gateway globals — no DB, no IMS
+        s.db_calls.clear()
+        h.queue(h.make_pdf("next.pdf", 1500))
+        h.tick()
+        check("second tick reuses the in-memory token (no DB calls)", s.db_calls == [])
+        check("second tick makes no IMS call", s.ims_calls == 1)
+
+        # Tick 3: the time budget stops draining and leaves the rest queued
+        s.uploads.clear()
+        s.tag_values["[default]AEM/Config/TickBudgetSeconds"] = 5
+        s.upload_delay_ms = 3000
+        budget_files = [h.make_pdf("budget_%d.pdf" % i, 1000) for i in range(4)]
+        h.queue(*budget_files)
+        h.tick()
+        check("tick budget limits uploads to 2 of 4", len(s.uploads) == 2)
+        check("files over budget stay queued", h.queued_paths() == budget_files[2:])
+        s.upload_delay_ms = 0
+        del s.tag_values["[default]AEM/Config/TickBudgetSeconds"]
+
+        # Tick 4: a missing file fails but the rest are still uploaded
+        s.uploads.clear()
+        missing = os.path.join(workdir, "missing.pdf")
+        good = h.make_pdf("good.pdf", 1200)
+        h.queue(missing, good)
+        h.tick()
+        check("failed file stays queued, others are uploaded",
+              h.queued_paths() == [missing] and len(s.uploads) == 1)
+
+        # Tick 5: legacy single-file tags still work and are cleared
+        s.uploads.clear()
+        h.queue()
+        s.tag_values["[default]AEM/Upload/FilePath"] = h.make_pdf("legacy.pdf", 1000)
+        s.tag_values["[default]AEM/Upload/Title"] = "Legacy"
+        h.tick()
+        check("legacy FilePath/Title tags are uploaded and cleared",
+              len(s.uploads) == 1 and s.tag_values["[default]AEM/Upload/FilePath"] == "")
+
+        # Tick 6: a row enqueued mid-tick is kept when uploaded rows are removed
+        s.uploads.clear()
+        s.tag_values["[default]AEM/Upload/FilePath"] = ""
+        first = h.make_pdf("first.pdf", 1000)
+        late = h.make_pdf("late.pdf", 1000)
+        h.queue(first)
+        s.on_upload = lambda: (h.aem_queue.enqueue_upload(late, "Late"), setattr(s, "on_upload", None))
+        h.tick()
+        check("row enqueued during a tick stays queued", h.queued_paths() == [late])
+
+        # enqueue_upload() waits for the queue lock held by remove_uploaded()
+        lock = h.aem_queue._lock()
+        lock.acquire()
+        writer = threading.Thread(target=h.aem_queue.enqueue_upload, args=(first, "First"))
+        writer.start()
+        writer.join(0.2)
+        blocked = writer.is_alive() and h.queued_paths() == [late]
+        lock.release()
+        writer.join()
+        check("enqueue_upload waits for the queue lock",
+              blocked and h.queued_paths() == [late, first])
+
+        # Ticks 7-9: a slow failing row at the head of the queue must not starve the rest
+        s.uploads.clear()
+        s.tag_values["[default]AEM/Config/TickBudgetSeconds"] = 5
+        bad = h.make_pdf("slow_bad.pdf", 1000)
+        good_files = [h.make_pdf("after_bad_%d.pdf" % i, 1000) for i in range(2)]
+        s.slow_failures["slow_bad.pdf"] = 10000  # longer than the whole tick budget
+        h.queue(bad, *good_files)
+        h.tick()
+        check("slow failing row uses the tick and moves behind the good rows",
+              len(s.uploads) == 1 and h.queued_paths() == good_files + [bad])
+        h.tick()
+        queue = s.tag_values[h.QUEUE_TAG]
+        check("next tick uploads the rows that were behind it",
+              [c.url.rsplit("/", 1)[1] for c in s.uploads[1:3]] == ["after_bad_0.pdf", "after_bad_1.pdf"]
+              and h.queued_paths() == [bad] and queue.getValueAt(0, "Attempts") == 2)
+        h.tick()
+        parked = s.tag_values.get(h.FAILED_TAG)
+        check("row is parked in the Failed tag after MaxAttempts (3) failures",
+              h.queued_paths() == [] and parked is not None and parked.getRowCount() == 1
+              and parked.getValueAt(0, "FilePath") == bad and parked.getValueAt(0, "Attempts") == 3
+              and "HTTP 500" in parked.getValueAt(0, "LastError"))
+        s.uploads.clear()
+        h.tick()
+        check("parked row is not uploaded again", s.uploads == [])
+        s.slow_failures.clear()
+        del s.tag_values["[default]AEM/Config/TickBudgetSeconds"]
+
+    if _failures:
+        print("\n%d check(s) failed." % len(_failures))
+        sys.exit(1)
+    print("\nAll checks passed.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,88 @@
 """
 aem_client.py — AEM HTTP operations: CSRF token fetch and PDF asset upload.
+
+`requests`, `rate_limit`, `hashlib` and `uuid` are imported on the real-mode path only
+(in upload_pdf), so mock runs never pay for them.
+
+Real-mode calls go through the shared rate limiter (rate_limit.py): each HTTP
+request takes a request token, and the multipart body is streamed in chunks
+that each take byte tokens, so upload throughput stays smooth under the cap.
+The PDF's SHA-256 is computed from the same chunks, so hashing costs no extra
+read of the file.
 """
+import io
 import logging
 import os
-
-import requests
+from typing import TYPE_CHECKING
 
 import aem_mock
 from config import Config
 
+if TYPE_CHECKING:
+    from rate_limit import RateLimiter
+
 log = logging.getLogger(__name__)
 
+_CHUNK_SIZE = 64 * 1024
 
-def _fetch_csrf_token(cfg: Config, access_token: str) -> str:
-    """Fetch a CSRF token from the AEM Granite endpoint."""
-    if cfg.mock_mode:
-        return aem_mock.mock_fetch_csrf_token()
+
+class _ThrottledMultipartBody:
+    """
+    File-like multipart/form-data body (title field + PDF file) that streams
+    the PDF from disk, pacing every chunk through the rate limiter and feeding
+    the PDF bytes to `digest` (a hashlib object) as they go.
+
+    Exposes __len__ so requests sends a Content-Length instead of chunking.
+    """
+
+    def __init__(self, file_obj, filename: str, title: str, boundary: str,
+                 limiter: "RateLimiter", digest):
+        head = (
+            f"--{boundary}\r\n"
+            'Content-Disposition: form-data; name="title"\r\n\r\n'
+            f"{title}\r\n"
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+            "Content-Type: application/pdf\r\n\r\n"
+        ).encode("utf-8")
+        tail = f"\r\n--{boundary}--\r\n".encode("utf-8")
+
+        self._length = len(head) + os.fstat(file_obj.fileno()).st_size + len(tail)
+        self._parts = [io.BytesIO(head), file_obj, io.BytesIO(tail)]
+        self._file_obj = file_obj
+        self._limiter = limiter
+        self._digest = digest
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self):
+        chunk = self.read(_CHUNK_SIZE)
+        while chunk:
+            yield chunk
+            chunk = self.read(_CHUNK_SIZE)
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            size = _CHUNK_SIZE
+        while self._parts:
+            chunk = self._parts[0].read(size)
+            if chunk:
+                self._limiter.acquire_bytes(len(chunk))
+                if self._parts[0] is self._file_obj:
+                    self._digest.update(chunk)
+                return chunk
+            self._parts.pop(0)
+        return b""
+
+
+def _fetch_csrf_token(cfg: Config, access_token: str, limiter: "RateLimiter") -> str:
+    """Fetch a CSRF token from the AEM Granite endpoint (real mode only)."""
+    import requests
 
     url = f"{cfg.upload_base_url}/libs/granite/csrf/token.json"
     log.info(f"[AEM] Fetching CSRF token from {url}")
+    limiter.acquire_request()
     resp = requests.get(
         url,
         headers={"Authorization": f"Bearer {access_token}"},
@@ -36,38 +100,50 @@ def upload_pdf(cfg: Config, file_path: str, title: str, access_token: str) -> di
     """
     Upload a PDF file to AEM Assets with a title metadata field.
 
-    Returns a dict with keys: status_code, asset_path.
+    Returns a dict with keys: status_code, asset_path, and (real mode) sha256
+    of the uploaded file, hashed while it was streamed.
     Exits with code 1 on any error.
     """
     if not os.path.isfile(file_path):
         log.error(f"[AEM] File not found: {file_path}")
         raise SystemExit(1)
 
-    csrf_token = _fetch_csrf_token(cfg, access_token)
-
     if cfg.mock_mode:
+        aem_mock.mock_fetch_csrf_token()
         return aem_mock.mock_upload_asset(file_path, title)
 
+    import hashlib
+    import rate_limit
+    import requests
+    import uuid
+
+    limiter = rate_limit.get_limiter(cfg)
+    csrf_token = _fetch_csrf_token(cfg, access_token, limiter)
+
     filename = os.path.basename(file_path)
     url = f"{cfg.upload_base_url}{cfg.assets_dam_path}/{filename}"
     log.info(f"[AEM] Uploading {filename} → {url}")
 
+    boundary = f"----AEMBoundary{uuid.uuid4().hex}"
+    sha256 = hashlib.sha256()
+
+    limiter.acquire_request()
     with open(file_path, "rb") as f:
         resp = requests.post(
             url,
             headers={
                 "Authorization": f"Bearer {access_token}",
                 "CSRF-Token": csrf_token,
+                "Content-Type": f"multipart/form-data; boundary={boundary}",
             },
-            files={"file": (filename, f, "application/pdf")},
-            data={"title": title},
+            data=_ThrottledMultipartBody(f, filename, title, boundary, limiter, sha256),
             timeout=120,
         )
 
     if resp.status_code == 201:
         asset_path = resp.headers.get("Location", url)
-        log.info(f"[AEM] Upload successful. Asset path: {asset_path}")
-        return {"status_code": 201, "asset_path": asset_path}
+        log.info(f"[AEM] Upload successful. Asset path: {asset_path}  sha256={sha256.hexdigest()}")
+        return {"status_code": 201, "asset_path": asset_path, "sha256": sha256.hexdigest()}
 
     log.error(f"[AEM] Upload failed: HTTP {resp.status_code} — {resp.text}")
     raise SystemExit(1)
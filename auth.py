@@ -4,14 +4,14 @@ auth.py — OAuth 2.0 Client Credentials token management.
 Flow:
   1. In mock mode → return hardcoded mock token immediately (no DB or HTTP).
   2. In real mode → check SQL cache; reuse if valid, otherwise call IMS and cache result.
+
+`requests` and `db` (which pulls in pyodbc) are imported on the real-mode
+path only, so mock runs never pay for them.
 """
 import logging
 from datetime import datetime, timedelta, timezone
 
-import requests
-
 import aem_mock
-import db
 from config import Config
 
 log = logging.getLogger(__name__)
@@ -30,6 +30,8 @@ def _is_expired(expires_at: datetime) -> bool:
 
 def _request_new_token(cfg: Config) -> tuple[str, datetime]:
     """Call the IMS token endpoint and return (access_token, expires_at)."""
+    import requests
+
     resp = requests.post(
         cfg.token_url,
         data={
@@ -60,6 +62,8 @@ def get_valid_token(cfg: Config) -> str:
         return data["access_token"]
 
     # ── Real mode ─────────────────────────────────────────────────────────────
+    import db
+
     db.ensure_table(cfg)
 
     access_token, expires_at = db.load_token(cfg)
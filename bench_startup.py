@@ -0,0 +1,139 @@
+"""
+bench_startup.py — Measure upload_asset.py startup cost and enforce a budget.
+
+Ignition spawns upload_asset.py once per file, so import time is paid on every
+upload. This runs a mock-mode upload of sample/sample.pdf several times under
+`python -X importtime`, reports the median total import time and wall time,
+and exits 1 if the median exceeds the budget or if a module that mock mode
+must never load (requests, pyodbc, db) shows up.
+
+Usage:
+    python bench_startup.py [--runs 7] [--budget-ms 60]
+
+The budget can also be set with AEM_STARTUP_BUDGET_MS. No external
+dependencies required beyond those of upload_asset.py itself.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+_SCRIPT = os.path.join(_HERE, "upload_asset.py")
+_SAMPLE = os.path.join(_HERE, "sample", "sample.pdf")
+
+_DEFAULT_BUDGET_MS = 60.0
+
+# Modules that must not be imported on the mock-mode path.
+_FORBIDDEN_IN_MOCK = ("requests", "pyodbc", "db")
+
+# Dummy values so load_config() passes validation without a .env file.
+_MOCK_ENV = {
+    "AEM_TOKEN_URL": "https://ims.invalid/ims/token/v3",
+    "AEM_CLIENT_ID": "bench",
+    "AEM_CLIENT_SECRET": "bench",
+    "AEM_SCOPE": "bench",
+    "AEM_UPLOAD_BASE_URL": "https://aem.invalid",
+    "AEM_ASSETS_DAM_PATH": "/api/assets/pdf-uploads",
+    "DB_SERVER": "bench",
+    "DB_NAME": "bench",
+    "DB_USER": "bench",
+    "DB_PASSWORD": "bench",
+    "AEM_MOCK_MODE": "true",
+}
+
+
+def _parse_importtime(stderr: str) -> tuple[float, set[str]]:
+    """
+    Return (total_import_ms, top_level_modules) from `-X importtime` output.
+
+    Lines look like:  import time:   self [us] | cumulative | imported package
+    Top-level imports have no leading spaces in the package column, so summing
+    their cumulative column gives the total time spent importing. Everything up
+    to and including `site` is interpreter bootstrap, outside the script's
+    control, and is not counted.
+    """
+    total_us = 0
+    modules: set[str] = set()
+    lines = stderr.splitlines()
+    for i, line in enumerate(lines):
+        if line.rstrip().endswith("| site"):
+            lines = lines[i + 1:]
+            break
+    for line in lines:
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue  # header row
+        package = parts[2].rstrip()
+        modules.add(package.strip())
+        if not package.startswith("  "):
+            total_us += int(parts[1])
+    return total_us / 1000.0, modules
+
+
+def _run_once() -> tuple[float, float, set[str]]:
+    """Run one mock upload; return (import_ms, wall_ms, imported_modules)."""
+    env = dict(os.environ, **_MOCK_ENV)
+    cmd = [sys.executable, "-X", "importtime", _SCRIPT,
+           "--file", _SAMPLE, "--title", "Startup Benchmark"]
+
+    start = time.perf_counter()
+    proc = subprocess.run(cmd, env=env, cwd=_HERE, capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - start) * 1000.0
+
+    if proc.returncode != 0:
+        print(proc.stderr, file=sys.stderr)
+        raise SystemExit(f"upload_asset.py exited with code {proc.returncode}")
+
+    import_ms, modules = _parse_importtime(proc.stderr)
+    return import_ms, wall_ms, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark upload_asset.py startup")
+    parser.add_argument("--runs", type=int, default=7, help="Number of runs (default 7)")
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=float(os.getenv("AEM_STARTUP_BUDGET_MS", _DEFAULT_BUDGET_MS)),
+        help=f"Max median import time in ms (default {_DEFAULT_BUDGET_MS:g})",
+    )
+    args = parser.parse_args()
+
+    if not os.path.isfile(_SAMPLE):
+        raise SystemExit(f"Missing {_SAMPLE} — run: python create_sample_pdf.py")
+
+    import_times, wall_times = [], []
+    seen: set[str] = set()
+    for _ in range(args.runs):
+        import_ms, wall_ms, modules = _run_once()
+        import_times.append(import_ms)
+        wall_times.append(wall_ms)
+        seen |= modules
+
+    import_median = statistics.median(import_times)
+    wall_median = statistics.median(wall_times)
+    print(f"Runs:               {args.runs}")
+    print(f"Import time median: {import_median:7.1f} ms  (budget {args.budget_ms:g} ms)")
+    print(f"Wall time median:   {wall_median:7.1f} ms")
+
+    failed = False
+    leaked = [m for m in _FORBIDDEN_IN_MOCK if m in seen]
+    if leaked:
+        print(f"FAIL: mock mode imported {', '.join(leaked)}")
+        failed = True
+    if import_median > args.budget_ms:
+        print(f"FAIL: import time {import_median:.1f} ms exceeds budget {args.budget_ms:g} ms")
+        failed = True
+
+    if failed:
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+check_pdf_validate.py — Exercise pdf_validate.py against hand-built PDFs.
+
+Validation runs by default and moves failing files out of the caller's
+folder, so a parser mistake is expensive. This builds small PDFs in a temp
+folder and checks that:
+  - a classic xref table, an incremental update (/Prev), a cross-reference
+    stream and a file with data before the %PDF- header are accepted
+  - an empty file, a truncated file, a startxref beyond the end of the file,
+    an xref entry that misses its object and a /Prev loop are rejected
+  - validate_files() gives the same answers from its process pool
+  - quarantine() moves the file, writes <name>.reason.txt, and does not
+    overwrite a file of the same name already in quarantine
+
+Usage:
+    python check_pdf_validate.py
+
+Exits with code 1 if any check fails. No external dependencies required.
+"""
+import logging
+import os
+import sys
+import tempfile
+
+import pdf_validate
+
+logging.basicConfig(
+    level=logging.CRITICAL,
+    format="%(asctime)s  %(levelname)-7s  %(message)s",
+    datefmt="%H:%M:%S",
+)
+
+_BODY = [
+    b"<< /Type /Catalog /Pages 2 0 R >>",
+    b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+    b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] >>",
+]
+
+
+# ── PDF builders ──────────────────────────────────────────────────────────────
+def _objects(out: bytearray, base: int, bodies, first: int = 1) -> list[int]:
+    """Append `N 0 obj` for each body to out; return offsets relative to base."""
+    offsets = []
+    for num, body in enumerate(bodies, first):
+        offsets.append(len(out) - base)
+        out += b"%d 0 obj\n%s\nendobj\n" % (num, body)
+    return offsets
+
+
+def _xref_table(out: bytearray, first: int, offsets: list[int], trailer: bytes) -> int:
+    """Append an xref section and trailer; return the section's offset."""
+    pos = len(out)
+    out += b"xref\n"
+    if first == 1:
+        out += b"0 %d\n0000000000 65535 f \n" % (len(offsets) + 1)
+    else:
+        out += b"%d %d\n" % (first, len(offsets))
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n" + trailer + b"\n"
+    return pos
+
+
+def _finish(out: bytearray, startxref: int) -> bytes:
+    out += b"startxref\n%d\n%%%%EOF\n" % startxref
+    return bytes(out)
+
+
+def classic_pdf(prefix: bytes = b"") -> bytes:
+    out = bytearray(prefix)
+    base = len(out)
+    out += b"%PDF-1.4\n"
+    offsets = _objects(out, base, _BODY)
+    pos = _xref_table(out, 1, offsets, b"<< /Size 4 /Root 1 0 R >>")
+    return _finish(out, pos - base)
+
+
+def incremental_pdf() -> bytes:
+    """A classic file plus one appended update whose trailer points back with /Prev."""
+    out = bytearray(classic_pdf())
+    prev = int(out[out.rfind(b"startxref") + len(b"startxref"):].split()[0])
+    offsets = _objects(out, 0, [b"(updated)"], first=4)
+    pos = _xref_table(out, 4, offsets, b"<< /Size 5 /Root 1 0 R /Prev %d >>" % prev)
+    return _finish(out, pos)
+
+
+def xref_stream_pdf() -> bytes:
+    out = bytearray(b"%PDF-1.5\n")
+    _objects(out, 0, _BODY)
+    pos = len(out)
+    out += (b"4 0 obj\n<< /Type /XRef /Size 5 /W [1 2 1] /Root 1 0 R /Length 0 >>\n"
+            b"stream\n\nendstream\nendobj\n")
+    return _finish(out, pos)
+
+
+def prev_loop_pdf() -> bytes:
+    """An xref section whose /Prev points at itself."""
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = _objects(out, 0, _BODY)
+    pos = len(out)
+    _xref_table(out, 1, offsets, b"<< /Size 4 /Root 1 0 R /Prev %010d >>" % pos)
+    return _finish(out, pos)
+
+
+def bad_entry_pdf() -> bytes:
+    """Object 2's xref entry points one byte past its `2 0 obj`."""
+    data = classic_pdf()
+    pos = data.rfind(b"\nxref\n")
+    entries = data[pos:].split(b"\n")  # "", "xref", "0 4", free entry, object 1, object 2, ...
+    good = int(entries[5].split()[0])
+    return data[:pos] + data[pos:].replace(b"%010d 00000 n" % good, b"%010d 00000 n" % (good + 1), 1)
+
+
+# ── Checks ────────────────────────────────────────────────────────────────────
+_failures = []
+
+
+def check(description, condition):
+    print(("PASS  " if condition else "FAIL  ") + description)
+    if not condition:
+        _failures.append(description)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as workdir:
+        def write(name, data):
+            path = os.path.join(workdir, name)
+            with open(path, "wb") as fh:
+                fh.write(data)
+            return path
+
+        good = {
+            "classic xref table": write("classic.pdf", classic_pdf()),
+            "incremental update with /Prev": write("incremental.pdf", incremental_pdf()),
+            "cross-reference stream": write("xref_stream.pdf", xref_stream_pdf()),
+            "data before the %PDF- header": write("prefixed.pdf", classic_pdf(prefix=b"\x00" * 200)),
+        }
+        bad = {
+            "empty file": (write("empty.pdf", b""), "empty file"),
+            "truncated file": (write("truncated.pdf", classic_pdf()[:-40]), "%%EOF"),
+            "startxref beyond end of file": (
+                write("bad_offset.pdf", classic_pdf().replace(b"startxref\n", b"startxref\n9")),
+                "beyond end of file",
+            ),
+            "xref entry that misses its object": (write("bad_entry.pdf", bad_entry_pdf()), "object 2"),
+            "/Prev loop": (write("loop.pdf", prev_loop_pdf()), "loops"),
+        }
+
+        for description, path in good.items():
+            result = pdf_validate.validate_pdf(path)
+            check(f"accepts {description}", result.ok and result.size == os.path.getsize(path))
+            if not result.ok:
+                print(f"      reason: {result.reason}")
+
+        for description, (path, expected) in bad.items():
+            result = pdf_validate.validate_pdf(path)
+            check(f"rejects {description}", not result.ok and expected in result.reason)
+            if result.ok or expected not in result.reason:
+                print(f"      reason: {result.reason!r} (expected {expected!r})")
+
+        paths = list(good.values()) + [path for path, _ in bad.values()]
+        futures = pdf_validate.validate_files(paths, workers=2)
+        check("validate_files() agrees with validate_pdf() for every file",
+              [f.result().ok for f in futures] == [p in good.values() for p in paths])
+
+        # quarantine(): move, reason file, and no overwrite of an earlier copy
+        quarantine_dir = os.path.join(workdir, "quarantine")
+        first = pdf_validate.quarantine(pdf_validate.validate_pdf(bad["truncated file"][0]), quarantine_dir)
+        check("quarantine() moves the file out of its folder",
+              first == os.path.join(quarantine_dir, "truncated.pdf")
+              and os.path.isfile(first) and not os.path.exists(bad["truncated file"][0]))
+        with open(first + ".reason.txt", encoding="utf-8") as fh:
+            reason = fh.read()
+        check("quarantine() writes <name>.reason.txt with the reason and SHA-256",
+              "%%EOF" in reason and "sha256:   " in reason and "size:" in reason)
+
+        again = write("truncated.pdf", classic_pdf()[:-20])
+        second = pdf_validate.quarantine(pdf_validate.validate_pdf(again), quarantine_dir)
+        with open(first, "rb") as fh:
+            first_kept = fh.read() == classic_pdf()[:-40]
+        check("quarantine() keeps an existing file of the same name",
+              second not in ("", first) and os.path.isfile(second)
+              and os.path.isfile(second + ".reason.txt") and first_kept)
+
+    if _failures:
+        print(f"\n{len(_failures)} check(s) failed.")
+        sys.exit(1)
+    print("\nAll checks passed.")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,12 +4,16 @@ config.py — Load and validate .env configuration.
 import os
 import logging
 from dataclasses import dataclass
-from dotenv import load_dotenv
-
-load_dotenv()
 
 log = logging.getLogger(__name__)
 
+_INSTALL_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Kept in the install folder, not the temp folder: temp is per Windows account, and
+# uploads spawned by the Ignition gateway service must share one file with batches
+# and `rate_limit.py` overrides run from an operator's console.
+DEFAULT_RATE_LIMIT_STATE_FILE = os.path.join(_INSTALL_DIR, "aem_upload_rate_limit.json")
+
 _REQUIRED_KEYS = [
     "AEM_TOKEN_URL",
     "AEM_CLIENT_ID",
@@ -38,9 +42,38 @@ class Config:
     db_password: str
     db_table: str
     mock_mode: bool
+    upload_max_bytes_per_sec: float
+    upload_max_requests_per_sec: float
+    rate_limit_state_file: str
+    validate_pdf: bool
+    quarantine_dir: str
+
+
+def _get_rate(key: str) -> float:
+    """Read an optional non-negative rate limit (0 = unlimited)."""
+    raw = os.getenv(key, "0") or "0"
+    try:
+        value = float(raw)
+    except ValueError:
+        value = -1
+    if value < 0:
+        log.error(f"[CONFIG] {key} must be a non-negative number, got: {raw}")
+        raise SystemExit(1)
+    return value
+
+
+def rate_limit_state_file() -> str:
+    """AEM_RATE_LIMIT_STATE_FILE as an absolute path (relative to the install folder, not the cwd)."""
+    return os.path.join(_INSTALL_DIR, os.getenv("AEM_RATE_LIMIT_STATE_FILE") or DEFAULT_RATE_LIMIT_STATE_FILE)
 
 
 def load_config() -> Config:
+    # python-dotenv is imported here rather than at module level so that
+    # importing config (e.g. for the Config type) costs nothing at startup.
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
     missing = [k for k in _REQUIRED_KEYS if not os.getenv(k)]
     if missing:
         log.error(f"[CONFIG] Missing required .env keys: {', '.join(missing)}")
@@ -59,4 +92,9 @@ def load_config() -> Config:
         db_password=os.getenv("DB_PASSWORD"),
         db_table=os.getenv("DB_TABLE_TOKEN_STORE", "aem_token_cache"),
         mock_mode=os.getenv("AEM_MOCK_MODE", "false").lower() == "true",
+        upload_max_bytes_per_sec=_get_rate("AEM_UPLOAD_MAX_BYTES_PER_SEC"),
+        upload_max_requests_per_sec=_get_rate("AEM_UPLOAD_MAX_REQUESTS_PER_SEC"),
+        rate_limit_state_file=rate_limit_state_file(),
+        validate_pdf=os.getenv("AEM_VALIDATE_PDF", "true").lower() == "true",
+        quarantine_dir=os.getenv("AEM_QUARANTINE_DIR", ""),
     )
@@ -0,0 +1,212 @@
+"""
+pdf_validate.py — Pre-upload PDF structure check.
+
+Catches truncated or corrupt PDFs before they are sent to AEM, where they
+would only fail after a full upload and then waste a retry.
+
+Each file is memory-mapped and checked for:
+  - a `%PDF-` header within the first 1024 bytes
+  - a `%%EOF` marker within the last 1024 bytes
+  - a `startxref` pointing inside the file
+  - the cross-reference chain (following /Prev): classic `xref` tables must
+    point every in-use entry at the matching `N G obj`; cross-reference
+    streams must be an object with /Type /XRef
+The checks only touch the header, trailer and xref regions (and the object
+headers the xref points at), so a valid file is never read in full here. Its
+SHA-256 is computed by aem_client.upload_pdf while the body streams to AEM.
+
+validate_files() runs the checks in a process pool so validation scales across
+cores ahead of the network-bound upload workers. Files that fail are moved to
+a quarantine folder with a `.reason.txt` next to them.
+"""
+import logging
+import mmap
+import os
+import re
+from dataclasses import dataclass
+from datetime import datetime
+
+log = logging.getLogger(__name__)
+
+_HEADER_WINDOW = 1024
+_TRAILER_WINDOW = 1024
+_TRAILER_DICT_WINDOW = 64 * 1024
+_MAX_XREF_SECTIONS = 64
+
+_STARTXREF_RE = re.compile(rb"startxref\s+(\d+)")
+_SUBSECTION_RE = re.compile(rb"\s*(\d+)\s+(\d+)[ \t]*\r?\n?")
+_ENTRY_RE = re.compile(rb"\s*(\d{10})\s+(\d{5})\s+([nf])")
+_OBJ_RE = re.compile(rb"\s*(\d+)\s+(\d+)\s+obj\b")
+_PREV_RE = re.compile(rb"/Prev\s+(\d+)")
+_XREF_TYPE_RE = re.compile(rb"/Type\s*/XRef\b")
+
+
+class PdfValidationError(Exception):
+    """Raised internally when a structural check fails; the message is the reason."""
+
+
+@dataclass
+class ValidationResult:
+    file_path: str
+    ok: bool
+    reason: str = ""
+    size: int = 0
+
+
+def _check_xref_table(mm: mmap.mmap, base: int, pos: int) -> int | None:
+    """Check a classic xref table at `pos`; return the /Prev offset, if any."""
+    pos += len(b"xref")
+    while True:
+        if mm[pos:pos + 64].lstrip().startswith(b"trailer"):
+            break
+        header = _SUBSECTION_RE.match(mm, pos)
+        if not header:
+            raise PdfValidationError(f"malformed xref subsection at byte {pos}")
+        first, count = int(header.group(1)), int(header.group(2))
+        pos = header.end()
+
+        for num in range(first, first + count):
+            entry = _ENTRY_RE.match(mm, pos)
+            if not entry:
+                raise PdfValidationError(f"malformed xref entry for object {num} at byte {pos}")
+            pos = entry.end()
+            if entry.group(3) != b"n":
+                continue
+            offset = base + int(entry.group(1))
+            obj = _OBJ_RE.match(mm, offset) if offset < len(mm) else None
+            if not obj or int(obj.group(1)) != num:
+                raise PdfValidationError(
+                    f"xref entry for object {num} points to byte {offset}, "
+                    f"which is not '{num} {int(entry.group(2))} obj'"
+                )
+
+    end = mm.find(b"startxref", pos, pos + _TRAILER_DICT_WINDOW)
+    trailer = mm[pos:end if end != -1 else pos + _TRAILER_DICT_WINDOW]
+    prev = _PREV_RE.search(trailer)
+    return int(prev.group(1)) if prev else None
+
+
+def _check_xref_stream(mm: mmap.mmap, pos: int) -> int | None:
+    """Check a cross-reference stream object at `pos`; return the /Prev offset, if any."""
+    if not _OBJ_RE.match(mm, pos):
+        raise PdfValidationError(f"startxref/Prev points to byte {pos}, which is neither 'xref' nor an object")
+    end = mm.find(b"stream", pos, pos + _TRAILER_DICT_WINDOW)
+    obj_dict = mm[pos:end if end != -1 else pos + _TRAILER_DICT_WINDOW]
+    if not _XREF_TYPE_RE.search(obj_dict):
+        raise PdfValidationError(f"object at byte {pos} is not a cross-reference stream")
+    prev = _PREV_RE.search(obj_dict)
+    return int(prev.group(1)) if prev else None
+
+
+def _check_structure(mm: mmap.mmap) -> None:
+    size = len(mm)
+
+    base = mm.find(b"%PDF-", 0, _HEADER_WINDOW)
+    if base == -1:
+        raise PdfValidationError("missing %PDF- header")
+
+    tail_start = max(0, size - _TRAILER_WINDOW)
+    if mm.rfind(b"%%EOF", tail_start) == -1:
+        raise PdfValidationError("missing %%EOF trailer (file truncated?)")
+
+    sx = mm.rfind(b"startxref", tail_start)
+    match = _STARTXREF_RE.match(mm, sx) if sx != -1 else None
+    if not match:
+        raise PdfValidationError("missing startxref")
+
+    offset = int(match.group(1))
+    seen = set()
+    while offset is not None:
+        pos = base + offset
+        if pos >= size:
+            raise PdfValidationError(f"xref offset {offset} is beyond end of file ({size} bytes)")
+        if offset in seen or len(seen) >= _MAX_XREF_SECTIONS:
+            raise PdfValidationError(f"cross-reference /Prev chain loops at offset {offset}")
+        seen.add(offset)
+
+        while pos < size and mm[pos:pos + 1].isspace():
+            pos += 1
+        if mm[pos:pos + 4] == b"xref":
+            offset = _check_xref_table(mm, base, pos)
+        else:
+            offset = _check_xref_stream(mm, pos)
+
+
+def validate_pdf(file_path: str) -> ValidationResult:
+    """Check one file's structure. Never raises; failures are in the result."""
+    try:
+        size = os.path.getsize(file_path)
+        if size == 0:
+            return ValidationResult(file_path, False, "empty file")
+        with open(file_path, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            _check_structure(mm)
+    except PdfValidationError as e:
+        return ValidationResult(file_path, False, str(e), size)
+    except (OSError, ValueError) as e:
+        # ValueError: mmap of a file truncated to 0 bytes after the size check.
+        return ValidationResult(file_path, False, f"cannot read file: {e}")
+    return ValidationResult(file_path, True, "", size)
+
+
+def validate_files(file_paths: list[str], workers: int | None = None) -> list:
+    """
+    Start validating every file in a process pool and return one Future per file
+    (resolving to a ValidationResult), in input order. Use as_completed() to hand
+    valid files to the uploaders as soon as each check finishes.
+    """
+    # Imported here: the single-file CLI path only needs validate_pdf().
+    from concurrent.futures import ProcessPoolExecutor
+
+    pool = ProcessPoolExecutor(max_workers=workers)
+    futures = [pool.submit(validate_pdf, path) for path in file_paths]
+    pool.shutdown(wait=False)
+    return futures
+
+
+def quarantine(result: ValidationResult, quarantine_dir: str) -> str:
+    """
+    Move a failed file into `quarantine_dir` (default: a `quarantine` folder next
+    to it) and write `<name>.reason.txt` alongside, with the file's SHA-256 so
+    the bad copy can be matched to its source. Returns the new path, or ""
+    if the file could not be moved — it is then left where it is and the reason
+    is only logged. Never raises.
+    """
+    import hashlib
+    import shutil
+
+    name = os.path.basename(result.file_path)
+    if not os.path.isfile(result.file_path):
+        log.error(f"[VALIDATE] {result.file_path}: {result.reason}")
+        return ""
+
+    target_dir = quarantine_dir or os.path.join(os.path.dirname(os.path.abspath(result.file_path)), "quarantine")
+    try:
+        os.makedirs(target_dir, exist_ok=True)
+        target = os.path.join(target_dir, name)
+        if os.path.exists(target):
+            stem, ext = os.path.splitext(name)
+            target = os.path.join(target_dir, f"{stem}.{datetime.now():%Y%m%d%H%M%S}{ext}")
+        shutil.move(result.file_path, target)
+    except OSError as e:
+        log.error(
+            f"[VALIDATE] {name}: {result.reason} — could not quarantine to {target_dir} ({e}); "
+            f"file left in place"
+        )
+        return ""
+
+    try:
+        sha256 = hashlib.sha256()
+        with open(target, "rb") as fh:
+            for block in iter(lambda: fh.read(1024 * 1024), b""):
+                sha256.update(block)
+        with open(target + ".reason.txt", "w", encoding="utf-8") as fh:
+            fh.write(f"file:     {result.file_path}\n")
+            fh.write(f"reason:   {result.reason}\n")
+            fh.write(f"sha256:   {sha256.hexdigest()}\n")
+            fh.write(f"size:     {result.size}\n")
+            fh.write(f"time:     {datetime.now().isoformat(timespec='seconds')}\n")
+    except OSError as e:
+        log.error(f"[VALIDATE] {name}: could not write reason file ({e})")
+
+    log.error(f"[VALIDATE] {name}: {result.reason} — quarantined to {target}")
+    return target
@@ -0,0 +1,277 @@
+"""
+rate_limit.py — Token-bucket rate limiter for AEM upload bandwidth and request rate.
+
+Two buckets are kept:
+  - bytes     → upload body bytes per second (AEM_UPLOAD_MAX_BYTES_PER_SEC)
+  - requests  → AEM HTTP requests per second  (AEM_UPLOAD_MAX_REQUESTS_PER_SEC)
+
+A limit of 0 disables that bucket.
+
+Bucket state is shared by every thread in the process (one limiter per process,
+see get_limiter) and by every process on the host through a small JSON state
+file guarded by an OS file lock. Ignition spawns one process per file, so the
+cross-process share is what keeps a batch of uploads under the cap. Only
+processes that resolve the same state file share a bucket; the default sits in
+the install folder so every Windows account finds the same one.
+
+Limits can be changed at runtime, without restarting anything, by writing an
+override into the state file (picked up within a second by every process using
+that file):
+    python rate_limit.py --bytes-per-sec 2000000 --requests-per-sec 5
+    python rate_limit.py --clear
+    python rate_limit.py                  # show current state
+"""
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from config import Config, rate_limit_state_file
+
+log = logging.getLogger(__name__)
+
+# Bucket capacity, in seconds of traffic. Kept small so throughput stays smooth.
+_BURST_SECONDS = 0.5
+
+# Bytes are reserved from the shared bucket in slices of this many seconds of
+# traffic, so the state file is touched ~20 times a second rather than per chunk.
+_SLICE_SECONDS = 0.05
+
+_MAX_SLEEP_SECONDS = 1.0
+
+# How often an unlimited bucket looks for a new state-file override.
+_OVERRIDE_CHECK_SECONDS = 1.0
+
+
+@contextmanager
+def _file_lock(path: str):
+    """Hold an exclusive OS lock on `path` (created if missing) for the block."""
+    with open(path, "a+b") as fh:
+        if os.name == "nt":
+            import msvcrt
+
+            fh.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(fh.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue  # LK_LOCK gives up after ~10 s — keep waiting
+            try:
+                yield
+            finally:
+                fh.seek(0)
+                msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+
+def _read_state(path: str) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            state = json.load(fh)
+        return state if isinstance(state, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_state(path: str, state: dict) -> None:
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(state, fh)
+
+
+def _take_from(state: dict, limits: dict, bucket: str, n: float,
+               slice_seconds: float) -> tuple[float, float]:
+    """
+    Refill `bucket` in `state` and try to take at least `n` tokens from it.
+
+    Returns (wait_seconds, granted). granted is 0 when the caller must wait.
+    Requests larger than the bucket are granted once it is full and leave it
+    in debt, so oversized chunks are still paced correctly.
+    """
+    rate = float(limits.get(bucket) or 0)
+    if rate <= 0:
+        return 0.0, n
+
+    capacity = max(rate * _BURST_SECONDS, 1.0)
+    amount = max(n, rate * slice_seconds)
+    now = time.time()
+
+    entry = state.setdefault(bucket, {"tokens": capacity, "ts": now})
+    elapsed = max(0.0, now - entry["ts"])
+    tokens = min(capacity, entry["tokens"] + elapsed * rate)
+    entry["ts"] = now
+
+    needed = min(amount, capacity)
+    if tokens >= needed:
+        entry["tokens"] = tokens - amount
+        return 0.0, amount
+
+    entry["tokens"] = tokens
+    return (needed - tokens) / rate, 0.0
+
+
+class RateLimiter:
+    """Thread-safe token-bucket limiter, optionally shared across processes via a state file."""
+
+    def __init__(self, bytes_per_sec: float = 0, requests_per_sec: float = 0,
+                 state_file: str | None = None):
+        self._lock = threading.Lock()
+        self._limits = {"bytes": float(bytes_per_sec), "requests": float(requests_per_sec)}
+        self._state_file = state_file
+        self._memory_state: dict = {}
+        self._allowance = 0.0  # bytes already reserved from the bucket but not yet sent
+        self._override: dict = {}
+        self._override_mtime: int | None = None
+        self._override_checked = float("-inf")
+
+    def set_limits(self, bytes_per_sec: float | None = None,
+                   requests_per_sec: float | None = None) -> None:
+        """Change this process's limits. A state-file override still takes precedence."""
+        with self._lock:
+            if bytes_per_sec is not None:
+                self._limits["bytes"] = float(bytes_per_sec)
+            if requests_per_sec is not None:
+                self._limits["requests"] = float(requests_per_sec)
+        log.info(
+            f"[RATE] Limits set: {self._limits['bytes']:.0f} B/s, "
+            f"{self._limits['requests']:g} req/s"
+        )
+
+    def acquire_request(self) -> None:
+        """Block until one request may be sent."""
+        self._acquire("requests", 1, 0.0)
+
+    def acquire_bytes(self, n: int) -> None:
+        """Block until `n` body bytes may be sent."""
+        with self._lock:
+            if self._allowance >= n:
+                self._allowance -= n
+                return
+            n -= self._allowance
+            self._allowance = 0.0
+
+        granted = self._acquire("bytes", n, _SLICE_SECONDS)
+        if granted > n:
+            with self._lock:
+                self._allowance += granted - n
+
+    def _acquire(self, bucket: str, n: float, slice_seconds: float) -> float:
+        while True:
+            wait, granted = self._take(bucket, n, slice_seconds)
+            if wait <= 0:
+                return granted
+            time.sleep(min(wait, _MAX_SLEEP_SECONDS))
+
+    def _cached_override(self) -> dict:
+        """
+        Return the state-file override, re-read at most once per
+        _OVERRIDE_CHECK_SECONDS and only when the file has changed. Caller holds _lock.
+        """
+        now = time.monotonic()
+        if now - self._override_checked < _OVERRIDE_CHECK_SECONDS:
+            return self._override
+        self._override_checked = now
+
+        try:
+            mtime = os.stat(self._state_file).st_mtime_ns
+        except OSError:
+            self._override, self._override_mtime = {}, None
+            return self._override
+        if mtime != self._override_mtime:
+            with _file_lock(self._state_file + ".lock"):
+                self._override = _read_state(self._state_file).get("override", {})
+            self._override_mtime = mtime
+        return self._override
+
+    def _take(self, bucket: str, n: float, slice_seconds: float) -> tuple[float, float]:
+        with self._lock:
+            if self._state_file is None:
+                return _take_from(self._memory_state, self._limits, bucket, n, slice_seconds)
+
+            # Unlimited bucket — no file I/O beyond the throttled override check.
+            limits = dict(self._limits, **self._cached_override())
+            if not limits.get(bucket):
+                return 0.0, n
+
+            with _file_lock(self._state_file + ".lock"):
+                state = _read_state(self._state_file)
+                self._override = state.get("override", {})
+                limits = dict(self._limits, **self._override)
+                result = _take_from(state, limits, bucket, n, slice_seconds)
+                if limits.get(bucket):
+                    _write_state(self._state_file, state)
+            return result
+
+
+# ── Process-wide limiter ──────────────────────────────────────────────────────
+_limiter: RateLimiter | None = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter(cfg: Config) -> RateLimiter:
+    """Return the limiter shared by all threads in this process, creating it from cfg."""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter(
+                bytes_per_sec=cfg.upload_max_bytes_per_sec,
+                requests_per_sec=cfg.upload_max_requests_per_sec,
+                state_file=cfg.rate_limit_state_file,
+            )
+        return _limiter
+
+
+def set_override(state_file: str, bytes_per_sec: float | None = None,
+                 requests_per_sec: float | None = None, clear: bool = False) -> dict:
+    """Write (or clear) limits in the state file; every process picks them up on its next acquire."""
+    with _file_lock(state_file + ".lock"):
+        state = _read_state(state_file)
+        override = {} if clear else state.get("override", {})
+        if bytes_per_sec is not None:
+            override["bytes"] = float(bytes_per_sec)
+        if requests_per_sec is not None:
+            override["requests"] = float(requests_per_sec)
+        if override:
+            state["override"] = override
+        else:
+            state.pop("override", None)
+        _write_state(state_file, state)
+    return state
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show or override the shared upload rate limits")
+    parser.add_argument("--bytes-per-sec", type=float, help="Upload bytes per second (0 = unlimited)")
+    parser.add_argument("--requests-per-sec", type=float, help="AEM requests per second (0 = unlimited)")
+    parser.add_argument("--clear", action="store_true", help="Remove overrides and fall back to .env limits")
+    parser.add_argument("--state-file", help="Shared state file (default: AEM_RATE_LIMIT_STATE_FILE)")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    state_file = os.path.abspath(args.state_file) if args.state_file else rate_limit_state_file()
+
+    if args.clear or args.bytes_per_sec is not None or args.requests_per_sec is not None:
+        state = set_override(state_file, args.bytes_per_sec, args.requests_per_sec, args.clear)
+        print(f"Override written to: {state_file}")
+        print("Only uploads whose AEM_RATE_LIMIT_STATE_FILE resolves to this path will see it.")
+    else:
+        state = _read_state(state_file)
+        print(f"State file: {state_file}")
+
+    print(json.dumps(state, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+scheduler.py — Priority / shortest-job-first scheduling for batch upload workers.
+
+Used by `upload_asset.py --folder` / `--manifest`. Jobs are picked by:
+  1. Effective priority — the job's class (high=0, normal=1, low=2), promoted
+     one class for every `aging_seconds` it has waited, so nothing starves.
+  2. File size, smallest first — only when shortest-job-first is enabled.
+  3. Submission order.
+
+Jobs of at least `large_bytes` are "large"; at most `max_large` of them run at
+once, so a few big drawing sets cannot occupy every worker.
+
+Jobs can be submitted while the workers run (start → submit… → close → join),
+which lets the validation stage feed files in as each check completes.
+
+Priorities change as jobs age, so the pending list is scanned on each pick
+rather than kept in a heap — batches are hundreds of files, not millions.
+"""
+import logging
+import math
+import os
+import statistics
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable
+
+log = logging.getLogger(__name__)
+
+PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+
+
+def parse_priority(value: str) -> int:
+    """Accept a class name (high/normal/low) or a non-negative integer."""
+    value = str(value).strip().lower()
+    if value in PRIORITIES:
+        return PRIORITIES[value]
+    if value.isdigit():
+        return int(value)
+    raise ValueError(f"Invalid priority '{value}' — use high, normal, low or an integer")
+
+
+def priority_name(priority: int) -> str:
+    for name, number in PRIORITIES.items():
+        if number == priority:
+            return name
+    return str(priority)
+
+
+@dataclass
+class UploadJob:
+    file_path: str
+    title: str
+    priority: int = PRIORITIES["normal"]
+    size: int = 0
+    seq: int = 0
+    enqueued_at: float = 0.0
+    started_at: float | None = None
+    result: dict | None = None
+    error: str | None = None
+
+    @property
+    def wait_seconds(self) -> float:
+        return (self.started_at or time.monotonic()) - self.enqueued_at
+
+
+@dataclass
+class SchedulerStats:
+    completed: int = 0
+    failed: int = 0
+    waits_by_priority: dict[int, list[float]] = field(default_factory=dict)
+
+
+def _p95(values: list[float]) -> float:
+    """Nearest-rank 95th percentile."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(0.95 * len(ordered)) - 1)]
+
+
+class UploadScheduler:
+    """Runs submitted UploadJobs on a pool of worker threads in scheduling order."""
+
+    def __init__(self, workers: int = 4, shortest_first: bool = False,
+                 aging_seconds: float = 60.0, large_bytes: int = 50 * 1024 * 1024,
+                 max_large: int = 1):
+        self.workers = max(1, workers)
+        self.shortest_first = shortest_first
+        self.aging_seconds = aging_seconds
+        self.large_bytes = large_bytes
+        self.max_large = max(1, max_large)
+
+        self._cond = threading.Condition()
+        self._pending: list[UploadJob] = []
+        self._running_large = 0
+        self._seq = 0
+        self._closed = False
+        self._threads: list[threading.Thread] = []
+        self.stats = SchedulerStats()
+
+    def submit(self, file_path: str, title: str, priority: int = PRIORITIES["normal"]) -> UploadJob:
+        """Queue a file. Its size is taken now for shortest-job-first and the large-upload cap."""
+        try:
+            size = os.path.getsize(file_path)
+        except OSError:
+            size = 0  # upload_pdf reports the missing file
+        with self._cond:
+            self._seq += 1
+            job = UploadJob(file_path, title, priority, size, self._seq, time.monotonic())
+            self._pending.append(job)
+            self._cond.notify()
+        return job
+
+    def _sort_key(self, job: UploadJob, now: float) -> tuple:
+        promoted = int((now - job.enqueued_at) // self.aging_seconds) if self.aging_seconds > 0 else 0
+        return (job.priority - promoted, job.size if self.shortest_first else 0, job.seq)
+
+    def _is_large(self, job: UploadJob) -> bool:
+        return job.size >= self.large_bytes
+
+    def _next_job(self) -> UploadJob | None:
+        """Block until a runnable job is available; None once the queue is drained."""
+        with self._cond:
+            while True:
+                if not self._pending:
+                    if self._closed:
+                        return None
+                    self._cond.wait()
+                    continue
+                now = time.monotonic()
+                candidates = [
+                    j for j in self._pending
+                    if not (self._is_large(j) and self._running_large >= self.max_large)
+                ]
+                if candidates:
+                    job = min(candidates, key=lambda j: self._sort_key(j, now))
+                    self._pending.remove(job)
+                    job.started_at = now
+                    if self._is_large(job):
+                        self._running_large += 1
+                    self.stats.waits_by_priority.setdefault(job.priority, []).append(job.wait_seconds)
+                    return job
+                # Only large jobs left and the cap is reached — wait for one to finish.
+                self._cond.wait()
+
+    def _finish(self, job: UploadJob) -> None:
+        with self._cond:
+            if self._is_large(job):
+                self._running_large -= 1
+            if job.error is None:
+                self.stats.completed += 1
+            else:
+                self.stats.failed += 1
+            self._cond.notify_all()
+
+    def _worker(self, upload: Callable[[UploadJob], dict]) -> None:
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            log.info(
+                f"[SCHED] Start {os.path.basename(job.file_path)} "
+                f"({priority_name(job.priority)}, {job.size} bytes, waited {job.wait_seconds:.1f}s)"
+            )
+            try:
+                job.result = upload(job)
+            except SystemExit:
+                # aem_client / auth log the cause and raise SystemExit(1) on failure.
+                job.error = "upload failed (see log above)"
+            except Exception as e:
+                job.error = str(e)
+                log.error(f"[SCHED] {job.file_path}: {e}")
+            finally:
+                self._finish(job)
+
+    def start(self, upload: Callable[[UploadJob], dict]) -> None:
+        """Start the workers. Jobs may keep being submitted until close()."""
+        self._threads = [
+            threading.Thread(target=self._worker, args=(upload,), name=f"upload-{i + 1}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for t in self._threads:
+            t.start()
+
+    def close(self) -> None:
+        """No more jobs will be submitted; workers exit once the queue drains."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def join(self) -> SchedulerStats:
+        """Wait for the workers to finish, log the metrics and return the stats."""
+        for t in self._threads:
+            t.join()
+        self.log_metrics()
+        return self.stats
+
+    def run(self, upload: Callable[[UploadJob], dict]) -> SchedulerStats:
+        """Process every already-submitted job with `upload(job)` and return the stats."""
+        self.start(upload)
+        self.close()
+        return self.join()
+
+    def wait_metrics(self) -> dict[str, dict[str, float]]:
+        """Return {priority_name: {count, median, p95}} of queue wait in seconds."""
+        with self._cond:
+            waits = {p: list(w) for p, w in self.stats.waits_by_priority.items()}
+        return {
+            priority_name(p): {
+                "count": len(w),
+                "median": statistics.median(w),
+                "p95": _p95(w),
+            }
+            for p, w in sorted(waits.items())
+        }
+
+    def log_metrics(self) -> None:
+        log.info(f"[SCHED] Completed {self.stats.completed}, failed {self.stats.failed}")
+        for name, m in self.wait_metrics().items():
+            log.info(
+                f"[SCHED] Queue wait {name:<6}  n={m['count']:<4}  "
+                f"median={m['median']:.2f}s  p95={m['p95']:.2f}s"
+            )
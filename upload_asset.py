@@ -4,21 +4,34 @@ upload_asset.py — AEM PDF upload entry point.
 Usage:
     python upload_asset.py --file <path-to-pdf> --title "<asset title>"
 
+Batch mode (one process, several concurrent upload workers):
+    python upload_asset.py --folder <dir> [--priority high|normal|low]
+    python upload_asset.py --manifest <jobs.csv> [--workers 4] [--sjf]
+
+    The manifest is a CSV with a header row: file,title,priority
+    (title defaults to the file name, priority to --priority). See scheduler.py
+    for how jobs are ordered.
+
+Unless AEM_VALIDATE_PDF=false, every file is structurally checked first
+(pdf_validate.py — in a process pool in batch mode) and corrupt or truncated
+files are quarantined instead of uploaded.
+
 Ignition example:
     system.util.execute([
         "python", "C:/aem-client/upload_asset.py",
         "--file", "C:/pdfs/document.pdf",
         "--title", "My Document"
     ])
+
+Ignition spawns a fresh process per file, so startup cost is paid on every
+upload. Project modules are imported inside main() and the heavy third-party
+ones (requests, pyodbc, python-dotenv) only on the code paths that use them.
+Check the budget with:  python bench_startup.py
 """
 import argparse
 import logging
 import sys
 
-import auth
-import aem_client
-from config import load_config
-
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s  %(levelname)-7s  %(message)s",
@@ -26,13 +39,155 @@ logging.basicConfig(
 )
 log = logging.getLogger(__name__)
 
+# argparse dests of the batch-only options, rejected when combined with --file.
+_BATCH_OPTIONS = ("workers", "priority", "sjf", "aging_seconds", "large_mb", "max_large", "validate_workers")
+
+
+def _load_jobs(args) -> list[tuple[str, str, int]]:
+    """Return (file_path, title, priority) for every file in --folder or --manifest."""
+    import csv
+    import os
+
+    from scheduler import parse_priority
+
+    default_priority = parse_priority(args.priority)
+
+    if args.folder:
+        names = sorted(n for n in os.listdir(args.folder) if n.lower().endswith(".pdf"))
+        return [
+            (os.path.join(args.folder, n), os.path.splitext(n)[0], default_priority)
+            for n in names
+        ]
+
+    jobs = []
+    with open(args.manifest, newline="", encoding="utf-8") as fh:
+        for row in csv.DictReader(fh):
+            path = (row.get("file") or "").strip()
+            if not path:
+                continue
+            title = (row.get("title") or "").strip() or os.path.splitext(os.path.basename(path))[0]
+            priority = row.get("priority")
+            jobs.append((path, title, parse_priority(priority) if priority else default_priority))
+    return jobs
+
+
+def _run_batch(args, cfg) -> int:
+    """Upload every queued file with the scheduler; return the process exit code."""
+    import threading
+
+    import auth
+    import aem_client
+    from scheduler import UploadScheduler
+
+    try:
+        jobs = _load_jobs(args)
+    except (OSError, ValueError) as e:
+        log.error(f"[BATCH] Could not read jobs: {e}")
+        return 1
+    if not jobs:
+        log.warning("[BATCH] No PDF files to upload.")
+        return 0
+
+    scheduler = UploadScheduler(
+        workers=args.workers,
+        shortest_first=args.sjf,
+        aging_seconds=args.aging_seconds,
+        large_bytes=int(args.large_mb * 1024 * 1024),
+        max_large=args.max_large,
+    )
+
+    # Serialise token checks so concurrent workers do not all refresh at once.
+    token_lock = threading.Lock()
+
+    def upload(job):
+        with token_lock:
+            token = auth.get_valid_token(cfg)
+        return aem_client.upload_pdf(cfg, job.file_path, job.title, token)
+
+    scheduler.start(upload)
+    quarantined = 0
+    unvalidated = 0
+
+    # Always close and join the scheduler, so a failure while feeding it never
+    # exits the process with daemon upload threads killed mid-upload.
+    try:
+        if cfg.validate_pdf:
+            # Validate in a process pool and feed each good file to the upload
+            # workers as soon as its check finishes.
+            from concurrent.futures import as_completed
+
+            import pdf_validate
+
+            log.info(f"[BATCH] Validating {len(jobs)} file(s) ahead of {scheduler.workers} upload worker(s)")
+            futures = pdf_validate.validate_files([path for path, _, _ in jobs], args.validate_workers)
+            job_for = dict(zip(futures, jobs))
+            for future in as_completed(futures):
+                path, title, priority = job_for[future]
+                try:
+                    result = future.result()
+                except Exception as e:  # e.g. BrokenProcessPool — the file itself may be fine
+                    log.error(f"[VALIDATE] {path}: validation did not complete ({e!r}) — not uploaded")
+                    unvalidated += 1
+                    continue
+                if result.ok:
+                    log.info(f"[VALIDATE] {result.file_path} OK  ({result.size} bytes)")
+                    scheduler.submit(result.file_path, title, priority)
+                else:
+                    pdf_validate.quarantine(result, cfg.quarantine_dir)
+                    quarantined += 1
+        else:
+            for path, title, priority in jobs:
+                scheduler.submit(path, title, priority)
+            log.info(f"[BATCH] Queued {len(jobs)} file(s) for {scheduler.workers} worker(s)")
+    finally:
+        scheduler.close()
+        stats = scheduler.join()
+
+    if quarantined:
+        log.warning(f"[BATCH] {quarantined} file(s) failed validation")
+    if unvalidated:
+        log.warning(f"[BATCH] {unvalidated} file(s) could not be validated and were left in place")
+    return 1 if stats.failed or quarantined or unvalidated else 0
+
 
 def main():
     parser = argparse.ArgumentParser(description="Upload a PDF to AEM Assets")
-    parser.add_argument("--file",  required=True, help="Path to the PDF file to upload")
-    parser.add_argument("--title", required=True, help="Asset title (metadata)")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--file", help="Path to the PDF file to upload")
+    source.add_argument("--folder", help="Batch: upload every PDF in this folder")
+    source.add_argument("--manifest", help="Batch: CSV of file,title,priority to upload")
+    parser.add_argument("--title", help="Asset title (metadata) — required with --file")
+
+    batch = parser.add_argument_group("batch options")
+    batch.add_argument("--workers", type=int, default=4, help="Concurrent upload workers (default 4)")
+    batch.add_argument("--priority", default="normal", help="Default priority: high, normal or low")
+    batch.add_argument("--sjf", action="store_true", help="Shortest job first within a priority")
+    batch.add_argument("--aging-seconds", type=float, default=60.0,
+                       help="Promote a waiting job one priority class per this many seconds (default 60)")
+    batch.add_argument("--large-mb", type=float, default=50.0,
+                       help="Files at least this size count as large (default 50)")
+    batch.add_argument("--max-large", type=int, default=1,
+                       help="Max large uploads running at once (default 1)")
+    batch.add_argument("--validate-workers", type=int, default=None,
+                       help="Processes for PDF validation (default: one per CPU)")
     args = parser.parse_args()
 
+    if args.file and not args.title:
+        parser.error("--title is required with --file")
+    if not args.file and args.title:
+        parser.error("--title only applies to --file; batch titles come from file names or the manifest")
+    if args.file:
+        used = [
+            "--" + dest.replace("_", "-") for dest in _BATCH_OPTIONS
+            if getattr(args, dest) != parser.get_default(dest)
+        ]
+        if used:
+            parser.error(f"{', '.join(used)} only apply to --folder / --manifest")
+
+    import auth
+    import aem_client
+    from config import load_config
+
     cfg = load_config()
 
     if cfg.mock_mode:
@@ -40,6 +195,18 @@ def main():
         log.warning("[MOCK MODE]  No real AEM or IMS calls will be made.")
         log.warning("=" * 60)
 
+    if not args.file:
+        sys.exit(_run_batch(args, cfg))
+
+    if cfg.validate_pdf:
+        import pdf_validate
+
+        check = pdf_validate.validate_pdf(args.file)
+        if not check.ok:
+            pdf_validate.quarantine(check, cfg.quarantine_dir)
+            sys.exit(1)
+        log.info(f"[VALIDATE] {args.file} OK  ({check.size} bytes)")
+
     token = auth.get_valid_token(cfg)
     result = aem_client.upload_pdf(cfg, args.file, args.title, token)
 